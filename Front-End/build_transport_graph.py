@@ -4,11 +4,25 @@ import math
 import os
 import shutil
 
+try:
+    import orjson  # C serializer, ~5-10x faster than stdlib json
+except ImportError:
+    orjson = None
+
 import geopandas as gpd
 import networkx as nx
+import numpy as np
 import pandas as pd
+import shapely
 import shapely.geometry as sg
 import shapely.ops as so
+from pyproj import Transformer
+from scipy.spatial import cKDTree
+
+# One shared WGS84 -> Web Mercator transformer: a direct vectorized PROJ
+# call on coordinate arrays, without building throwaway GeoSeries just
+# to reproject a handful of points
+TO_METRIC = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -53,78 +67,90 @@ def build_graph():
 
     # Load Lanes
     # Fix: Ensure CRS is set if missing
-    lanes = gpd.read_file(LANES_FILE)
+    lanes = gpd.read_file(LANES_FILE, use_arrow=True)
     if lanes.crs is None:
         logging.warning("Lanes CRS is missing. Assuming EPSG:4326.")
         lanes.set_crs(epsg=4326, inplace=True)
     
     # Load Ports
-    ports = gpd.read_file(PORTS_FILE)
+    ports = gpd.read_file(PORTS_FILE, use_arrow=True)
     if ports.crs is None:
         logging.warning("Ports CRS is missing. Assuming EPSG:4326.")
         ports.set_crs(epsg=4326, inplace=True)
 
     # Convert to necessary CRSs
-    # WGS84 for output coords
-    lanes_geo = lanes.to_crs(epsg=4326)
-    ports_geo = ports.to_crs(epsg=4326)
+    # WGS84 for output coords - skip the PROJ pass when already WGS84
+    # (the common case for the bundled GeoJSON files)
+    lanes_geo = lanes if lanes.crs.to_epsg() == 4326 else lanes.to_crs(epsg=4326)
+    ports_geo = ports if ports.crs.to_epsg() == 4326 else ports.to_crs(epsg=4326)
     
     # Metric for calculations
     lanes_metric = lanes.to_crs(epsg=3857)
     ports_metric = ports.to_crs(epsg=3857)
     
     # 2. Build Chokepoint Geometries (Metric)
+    # Points + a dwithin radius replace the old buffer polygons: no buffer
+    # allocation, and the proximity test stays a vectorized GEOS call.
     cp_definitions = define_chokepoints()
-    cp_buffers = []
-    
-    for name, (lat, lon) in cp_definitions.items():
-        pt = sg.Point(lon, lat) # EPSG:4326
-        gdf_pt = gpd.GeoDataFrame({'name': [name]}, geometry=[pt], crs="EPSG:4326").to_crs(epsg=3857)
-        buf = gdf_pt.geometry.buffer(CHOKEPOINT_BUFFER_KM * 1000).iloc[0]
-        cp_buffers.append({'name': name, 'geometry': buf})
+    cp_names = list(cp_definitions)
+    cp_lons = [lon for lat, lon in cp_definitions.values()]
+    cp_lats = [lat for lat, lon in cp_definitions.values()]
+    cp_points_metric = shapely.points(*TO_METRIC.transform(cp_lons, cp_lats))
     
     # 3. Construct Graph from Lanes
-    # Explode multi-geometries
-    lanes_geo = lanes_geo.explode(index_parts=True).reset_index(drop=True)
+    # Explode multi-geometries (ignore_index does the reset in one pass)
+    lanes_geo = lanes_geo.explode(index_parts=False, ignore_index=True)
     
     G = nx.Graph()
-    
+
     logging.info(f"Processing {len(lanes_geo)} lane segments...")
+
+    # Reproject all exploded lanes in one pass and compute lengths with
+    # shapely's vectorized ufunc, instead of a GeoSeries round-trip per lane.
+    lane_geoms_metric = lanes_geo.geometry.to_crs(epsg=3857).values
+    lane_lengths_km = shapely.length(lane_geoms_metric) / 1000.0
+
+    # Chokepoint proximity for every lane in one broadcast GEOS call
+    # (lanes x chokepoints), instead of a dwithin call per lane in the
+    # loop. The GeometryArray needs a plain object ndarray to broadcast.
+    cp_within = shapely.dwithin(np.asarray(lane_geoms_metric, dtype=object)[:, None],
+                                np.asarray(cp_points_metric, dtype=object)[None, :],
+                                CHOKEPOINT_BUFFER_KM * 1000)
     
     SNAP_TOLERANCE_DEG = 0.2  # ~2km (Visual precision)
     PROXIMITY_RADIUS_DEG = 0.5 # ~55km (Connectivity radius for new edges)
 
-    # Spatial Index for snapping
-    # List of (id, lat, lon)
-    existing_nodes = []
+    # Spatial hash for snapping: nodes bucketed by tolerance-sized grid
+    # cell, so a snap only compares the 3x3 neighborhood instead of every
+    # existing node (the old linear scan made the build O(edges * nodes))
+    cell_index = {}
     next_node_id = 0
-    
+
     def get_or_create_node(pt):
         nonlocal next_node_id
-        
-        # Naive linear search for snapping (sufficient for <10k nodes)
-        # We search for ANY existing node within SNAP_TOLERANCE_DEG
-        
-        # Optimization: Filter by rough bounding box first if needed, 
-        # but for 2000 nodes, simple loop is fine.
-        
+
+        ci = int(pt.y // SNAP_TOLERANCE_DEG)
+        cj = int(pt.x // SNAP_TOLERANCE_DEG)
+
         best_node_id = None
-        min_dist = float('inf')
-        
-        for n_id, n_lat, n_lon in existing_nodes:
-            # Euclidean distance in degrees
-            dist = math.sqrt((pt.y - n_lat)**2 + (pt.x - n_lon)**2)
-            if dist < SNAP_TOLERANCE_DEG and dist < min_dist:
-                min_dist = dist
-                best_node_id = n_id
-        
+        min_dist = SNAP_TOLERANCE_DEG # Same strict tolerance as the old scan
+
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                for n_id, n_lat, n_lon in cell_index.get((ci + di, cj + dj), ()):
+                    # Euclidean distance in degrees
+                    dist = math.hypot(pt.y - n_lat, pt.x - n_lon)
+                    if dist < min_dist:
+                        min_dist = dist
+                        best_node_id = n_id
+
         if best_node_id is not None:
             return best_node_id
-            
+
         # Create new node
         new_id = str(next_node_id)
         G.add_node(new_id, lat=pt.y, lon=pt.x)
-        existing_nodes.append((new_id, pt.y, pt.x))
+        cell_index.setdefault((ci, cj), []).append((new_id, pt.y, pt.x))
         next_node_id += 1
         return new_id
 
@@ -140,24 +166,24 @@ def build_graph():
             u = get_or_create_node(start_pt)
             v = get_or_create_node(end_pt)
             
-            # Calculate metrics using the projected version
-            # We need to find the corresponding metric geometry. 
-            # Re-projecting individual geometry is safer than index matching after explode
-            geom_metric = gpd.GeoSeries([geom], crs="EPSG:4326").to_crs(epsg=3857).iloc[0]
-            dist_km = geom_metric.length / 1000.0
+            # Metrics come from the bulk-projected arrays above.
+            # Positional indexing is safe: lanes_geo was reset after explode.
+            geom_metric = lane_geoms_metric[idx]
+            dist_km = lane_lengths_km[idx]
             
-            intersected_cps = []
-            for cp in cp_buffers:
-                if geom_metric.intersects(cp['geometry']):
-                    intersected_cps.append(cp['name'])
+            intersected_cps = [cp_names[i] for i in np.flatnonzero(cp_within[idx])]
             
             # Snap the geometry endpoints to the nodes
-            # This ensures visually connected lines in the frontend
-            snapped_coords = list(geom.coords)
-            
+            # This ensures visually connected lines in the frontend.
+            # float32 is ~1m precision at these magnitudes — plenty for
+            # display — and the typed array is a quarter the size of a
+            # list of tuple-of-float (orjson encodes it directly via
+            # OPT_SERIALIZE_NUMPY)
+            snapped_coords = np.asarray(geom.coords, dtype=np.float32)
+
             u_data = G.nodes[u]
             v_data = G.nodes[v]
-            
+
             # Replace start point
             snapped_coords[0] = (u_data['lon'], u_data['lat'])
             # Replace end point
@@ -172,12 +198,10 @@ def build_graph():
                 "lane_id": str(idx)
             }
             edge_list.append(edge_data)
-            G.add_edge(u, v, weight=dist_km, **edge_data)
+            G.add_edge(u, v, weight=dist_km)
 
     logging.info(f"Base Lane Graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
-    
-    logging.info(f"Base Lane Graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
-    
+
     # [REMOVED] Bridging logic removed per user request.
     # Connectivity now relies on dead-end fixing and proximity edges.
 
@@ -190,61 +214,59 @@ def build_graph():
     
     # Pre-cache all node data for speed
     all_node_data = [(n, d['lat'], d['lon']) for n, d in G.nodes(data=True)]
-    
+
     new_edges_count = 0
     DEAD_END_SEARCH_RADIUS = 10.0 # Search far enough to find *something* (approx 1000km)
-    
-    for u in dead_ends:
-        u_data = G.nodes[u]
-        u_lat = u_data['lat']
-        u_lon = u_data['lon']
-        
-        # [User Request] Skip "solo shipping points" at the dateline (-179 / +179)
-        # We handle Dateline connectivity in the Frontend now.
-        if abs(u_lon) > 175.0:
-            continue
-        
-        # Get existing neighbors to exclude them
-        neighbors = set(G.neighbors(u))
-        
-        best_target = None
-        min_dist = float('inf')
-        
-        for v, v_lat, v_lon in all_node_data:
-            if v == u or v in neighbors:
-                continue
-                
-            d_lat = abs(u_lat - v_lat)
-            d_lon = abs(u_lon - v_lon)
-            
-            if d_lat > DEAD_END_SEARCH_RADIUS or d_lon > DEAD_END_SEARCH_RADIUS:
-                continue
-                
-            dist_sq = d_lat**2 + d_lon**2
-            
-            if dist_sq < min_dist:
-                min_dist = dist_sq
-                best_target = v
-                
-        if best_target and min_dist < (DEAD_END_SEARCH_RADIUS**2):
-            dist_km = math.sqrt(min_dist) * 111.0
-            
-            # Add edge
-            geom_line = [(u_lon, u_lat), (G.nodes[best_target]['lon'], G.nodes[best_target]['lat'])]
-             
-            edge_data = {
-                "source": u,
-                "target": best_target,
-                "dist_km": dist_km,
-                "geometry": geom_line,
-                "chokepoints": [],
-                "lane_id": f"fix_{u}_{best_target}",
-                "fixed": True
-            }
-            edge_list.append(edge_data)
-            G.add_edge(u, best_target, weight=dist_km, **edge_data)
-            new_edges_count += 1
-            
+
+    # KDTree over node lat/lon: one batched k-nearest query for all dead
+    # ends replaces the per-dead-end scan over every node. k of a few is
+    # enough to skip the self-match and the node's own segment partner.
+    node_id_arr = np.array([n for n, _, _ in all_node_data])
+    node_tree_deg = cKDTree([(lat, lon) for _, lat, lon in all_node_data])
+
+    # [User Request] Skip "solo shipping points" at the dateline (-179 / +179)
+    # We handle Dateline connectivity in the Frontend now.
+    candidates = [u for u in dead_ends if abs(G.nodes[u]['lon']) <= 175.0]
+
+    if candidates:
+        de_coords = [(G.nodes[u]['lat'], G.nodes[u]['lon']) for u in candidates]
+        k = min(8, len(all_node_data))
+        de_dists, de_idxs = node_tree_deg.query(
+            de_coords, k=k, distance_upper_bound=DEAD_END_SEARCH_RADIUS)
+
+        for row, u in enumerate(candidates):
+            # Get existing neighbors to exclude them
+            neighbors = set(G.neighbors(u))
+
+            for d_deg, j in zip(np.atleast_1d(de_dists[row]), np.atleast_1d(de_idxs[row])):
+                if j >= len(node_id_arr): # Padded miss beyond the radius
+                    break
+                best_target = node_id_arr[j]
+                if best_target == u or best_target in neighbors:
+                    continue
+
+                dist_km = d_deg * 111.0
+
+                # Add edge (same compact float32 form as the lane edges)
+                geom_line = np.asarray(
+                    [(G.nodes[u]['lon'], G.nodes[u]['lat']),
+                     (G.nodes[best_target]['lon'], G.nodes[best_target]['lat'])],
+                    dtype=np.float32)
+
+                edge_data = {
+                    "source": u,
+                    "target": best_target,
+                    "dist_km": dist_km,
+                    "geometry": geom_line,
+                    "chokepoints": [],
+                    "lane_id": f"fix_{u}_{best_target}",
+                    "fixed": True
+                }
+                edge_list.append(edge_data)
+                G.add_edge(u, best_target, weight=dist_km)
+                new_edges_count += 1
+                break
+
     logging.info(f"Connected {new_edges_count} dead ends.")
     
     # --- Connect International Date Line (Pacific Crossing) ---
@@ -262,60 +284,50 @@ def build_graph():
             
     # logging.info(f"Found {len(dateline_nodes)} candidate nodes near dateline (>175 deg).")
     # ... (Rest of logic disabled)
-    node_points = []
-    node_ids_list = []
-    for n, d in G.nodes(data=True):
-        node_points.append(sg.Point(d['lon'], d['lat']))
-        node_ids_list.append(n)
-        
-    if not node_points:
+    if G.number_of_nodes() == 0:
         logging.error("Graph has no nodes! Check input data.")
         return
 
-    gdf_nodes = gpd.GeoDataFrame({'node_id': node_ids_list}, geometry=node_points, crs="EPSG:4326").to_crs(epsg=3857)
-    
-    # Sjoin nearest ports -> nodes
-    nearest_nodes = gpd.sjoin_nearest(ports_metric, gdf_nodes, distance_col="dist_to_node")
-    
+    # Single pass over the node view, unzipped straight into columns
+    node_ids_list, node_lats, node_lons = zip(
+        *((n, d['lat'], d['lon']) for n, d in G.nodes(data=True)))
+
+    # KDTree over metric node coordinates: one batched query replaces the
+    # sjoin_nearest pass (and the intermediate nodes GeoDataFrame).
+    node_x, node_y = TO_METRIC.transform(node_lons, node_lats)
+    node_tree = cKDTree(np.c_[node_x, node_y])
+    port_xy = np.c_[ports_metric.geometry.x, ports_metric.geometry.y]
+    dist_to_node, nn = node_tree.query(port_xy, k=1)
+
     final_ports = {}
-    
-    for idx, row in nearest_nodes.iterrows():
-        # Because we exploded lanes, port index matches row index assuming reset_index in sjoin
-        # Ports GDF has 'port_id'
-        pid = str(row['port_id'])
-        nid = str(row['node_id'])
-        
-        # Get metadata from original ports_geo using the ID
-        # (Assuming unique port_ids)
-        mask = ports_geo['port_id'].astype(str) == pid
-        if not mask.any():
-            continue
-            
-        original_port = ports_geo[mask].iloc[0]
-        
+
+    # Pre-extract metadata to NumPy arrays: ports_metric and ports_geo are
+    # the same rows, so positional indexing replaces the per-port
+    # boolean-mask lookup into ports_geo.
+    port_ids = ports_geo['port_id'].astype(str).to_numpy()
+    port_lons = ports_geo.geometry.x.to_numpy()
+    port_lats = ports_geo.geometry.y.to_numpy()
+    port_names = ports_geo['CITY'].to_numpy() if 'CITY' in ports_geo.columns else None
+    port_countries = ports_geo['COUNTRY'].to_numpy() if 'COUNTRY' in ports_geo.columns else None
+
+    for i in range(len(port_ids)):
+        pid = port_ids[i]
         final_ports[pid] = {
             "id": pid,
-            "name": original_port.get("CITY", f"Port {pid}"),
-            "country": original_port.get("COUNTRY", ""),
-            "lat": original_port.geometry.y,
-            "lon": original_port.geometry.x,
-            "node_id": nid,
-            "dist_to_node": row['dist_to_node']
+            "name": port_names[i] if port_names is not None else f"Port {pid}",
+            "country": port_countries[i] if port_countries is not None else "",
+            "lat": float(port_lats[i]),
+            "lon": float(port_lons[i]),
+            "node_id": str(node_ids_list[nn[i]]),
+            "dist_to_node": float(dist_to_node[i])
         }
     
     logging.info(f"Mapped {len(final_ports)} ports to graph nodes.")
     
-    # 5. Output
-    output = {
-        "nodes": {},
-        "edges": edge_list,
-        "ports": final_ports, # Dict: port_id -> {node_id, ...}
-        "chokepoints": {}
-    }
-    # 6. Save Graph
+    # 5. Output / Save Graph
 
     output_file = "maritime_transport_graph.json"
-    
+
     # Prepare chokepoints data in the desired format
     final_chokepoints = {}
     for name, (lat, lon) in cp_definitions.items():
@@ -325,20 +337,38 @@ def build_graph():
             "lon": lon
         }
 
-    with open(output_file, 'w') as f:
-        json.dump({
-            "nodes": {n: {"id": n, "lat": d['lat'], "lon": d['lon']} for n, d in G.nodes(data=True)},
-            "edges": edge_list,
-            "ports": final_ports,
-            "chokepoints": final_chokepoints
-        }, f)
+    graph_data = {
+        # Reuse the columns unzipped above instead of a second pass over
+        # the node attribute views
+        "nodes": {n: {"id": n, "lat": lat, "lon": lon}
+                  for n, lat, lon in zip(node_ids_list, node_lats, node_lons)},
+        "edges": edge_list,
+        "ports": final_ports,
+        "chokepoints": final_chokepoints
+    }
+
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(graph_data, option=orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        # Stdlib fallback needs a hand with the ndarray edge geometries
+        with open(output_file, 'w') as f:
+            json.dump(graph_data, f, default=lambda o: o.tolist())
         
     logging.info(f"Saved graph to {output_file} ({os.path.getsize(output_file)/1024:.1f} KB)")
     
     # Auto-Deploy to React App
     deploy_path = "maritime-twin/public/data/graph.json"
     if os.path.exists("maritime-twin/public/data"):
-        shutil.copy(output_file, deploy_path)
+        # Hardlink when both paths share a filesystem: no byte copy, the
+        # deploy is just a new directory entry. Fall back to a real copy
+        # (e.g. cross-device, or a filesystem without hardlinks).
+        try:
+            if os.path.exists(deploy_path):
+                os.remove(deploy_path)
+            os.link(output_file, deploy_path)
+        except OSError:
+            shutil.copy(output_file, deploy_path)
         logging.info(f"Deployed graph to {deploy_path}")
     else:
         logging.warning("Could not find React public/data folder. Manual copy required.")
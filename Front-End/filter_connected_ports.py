@@ -1,11 +1,20 @@
 import geopandas as gpd
+import numpy as np
 import pandas as pd
+import shapely
 import shapely.geometry as sg
+from pyproj import Transformer
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import json
 import logging
 import os
 
+try:
+    import orjson  # C parser, considerably faster than stdlib json
+except ImportError:
+    orjson = None
+
 # Configuration
 SHIPPING_LANES_FILE = "Shipping-Lanes-v1.shp"
 PORTS_FILE = "ports.json"
@@ -16,21 +25,43 @@ DISTANCE_THRESHOLD_KM = 50
 CRS_METRIC = "EPSG:3857"  # Web Mercator for meter-based operations
 CRS_GEO = "EPSG:4326"     # WGS84 for lat/lon outputs
 
+# GeoParquet caches of the reprojected inputs (much faster than re-parsing
+# the shapefile/JSON on every run)
+LANES_CACHE = "lanes_preproc.parquet"
+PORTS_CACHE = "ports_preproc.parquet"
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# WGS84 -> Web Mercator on flat coordinate arrays: one vectorized PROJ
+# call instead of a per-geometry transform through to_crs
+TO_METRIC = Transformer.from_crs(CRS_GEO, CRS_METRIC, always_xy=True)
+
 def load_data():
     """Loads and standardizes shipping lanes and ports data."""
     logging.info("Loading Data...")
-    
+
+    # Fast path: preprocessed GeoParquet caches from a previous run
+    if os.path.exists(LANES_CACHE) and os.path.exists(PORTS_CACHE):
+        logging.info("Loading preprocessed Parquet caches...")
+        return gpd.read_parquet(LANES_CACHE), gpd.read_parquet(PORTS_CACHE)
+
     # Load Shipping Lanes
     if not os.path.exists(SHIPPING_LANES_FILE):
         logging.error(f"File not found: {SHIPPING_LANES_FILE}")
         return None, None
         
-    lanes = gpd.read_file(SHIPPING_LANES_FILE)
+    lanes = gpd.read_file(SHIPPING_LANES_FILE, use_arrow=True)
     if lanes.crs is None:
         lanes.set_crs(CRS_GEO, inplace=True) # Assuming WGS84 if not set
-    lanes = lanes.to_crs(CRS_METRIC)
+    if lanes.crs.to_epsg() == 4326:
+        # Flatten every vertex, transform once, write back in place
+        geoms = lanes.geometry.values.copy()
+        coords = shapely.get_coordinates(geoms)
+        xs, ys = TO_METRIC.transform(coords[:, 0], coords[:, 1])
+        geoms = shapely.set_coordinates(geoms, np.c_[xs, ys])
+        lanes = lanes.set_geometry(gpd.GeoSeries(geoms, index=lanes.index, crs=CRS_METRIC))
+    else:
+        lanes = lanes.to_crs(CRS_METRIC)
     # Ensure unique ID for lanes if not present
     if "lane_id" not in lanes.columns:
         lanes["lane_id"] = lanes.index 
@@ -40,40 +71,51 @@ def load_data():
         logging.error(f"File not found: {PORTS_FILE}")
         return None, None
 
-    with open(PORTS_FILE, "r") as f:
-        ports_data = json.load(f)
+    if orjson is not None:
+        with open(PORTS_FILE, "rb") as f:
+            ports_data = orjson.loads(f.read())
+    else:
+        with open(PORTS_FILE, "r") as f:
+            ports_data = json.load(f)
     
     df_ports = pd.DataFrame(ports_data)
-    geometry = [sg.Point(xy) for xy in zip(df_ports["LONGITUDE"], df_ports["LATITUDE"])]
-    ports = gpd.GeoDataFrame(df_ports, geometry=geometry, crs=CRS_GEO)
-    ports = ports.to_crs(CRS_METRIC)
+    # Transform the raw lon/lat arrays, then build the metric points in
+    # one vectorized constructor — no intermediate 4326 GeoDataFrame
+    xs, ys = TO_METRIC.transform(df_ports["LONGITUDE"].to_numpy(), df_ports["LATITUDE"].to_numpy())
+    ports = gpd.GeoDataFrame(df_ports, geometry=shapely.points(xs, ys), crs=CRS_METRIC)
     
     # Ensure unique ID for ports
     ports["port_id"] = ports.index
-    
+
+    # Cache the reprojected frames for the next run
+    try:
+        lanes.to_parquet(LANES_CACHE)
+        ports.to_parquet(PORTS_CACHE)
+    except ImportError:
+        logging.info("pyarrow not installed; skipping Parquet cache.")
+
     return lanes, ports
 
 def filter_ports(lanes, ports):
     """Filters ports based on distance to nearest shipping lane."""
     logging.info(f"Filtering ports within {DISTANCE_THRESHOLD_KM} km of shipping lanes...")
     
-    # Use sjoin_nearest to find nearest lane and distance for ALL ports
-    # max_distance argument is efficient but we want distances for all to verify
-    # However, sjoin_nearest with max_distance is much faster.
-    
     threshold_meters = DISTANCE_THRESHOLD_KM * 1000
-    
-    # Perform spatial join
-    # "dist_meters" will contain the distance
-    nearest = gpd.sjoin_nearest(ports, lanes, how="inner", max_distance=threshold_meters, distance_col="dist_meters")
-    
-    # Handle duplicates (a port might be close to multiple lane segments)
-    # Keep the one with the minimum distance
-    connected_ports = nearest.sort_values("dist_meters").drop_duplicates("port_id")
-    
-    # Add distance in km
-    connected_ports["distance_to_route_km"] = connected_ports["dist_meters"] / 1000.0
-    connected_ports["nearest_route_id"] = connected_ports["lane_id"] # Rename for clarity
+
+    # Query the STRtree directly instead of going through sjoin_nearest:
+    # two NumPy arrays back, no DataFrame merge bookkeeping, and
+    # all_matches=False already yields a single nearest lane per port.
+    tree = shapely.STRtree(lanes.geometry.values)
+    (port_pos, lane_pos), dists = tree.query_nearest(
+        ports.geometry.values,
+        max_distance=threshold_meters,
+        return_distance=True,
+        all_matches=False,
+    )
+
+    connected_ports = ports.iloc[port_pos].copy()
+    connected_ports["distance_to_route_km"] = dists / 1000.0
+    connected_ports["nearest_route_id"] = lanes["lane_id"].to_numpy()[lane_pos]
     
     # Clean up columns for export (keep original port columns + new info)
     # dropping columns from the lane dataset that joined
@@ -96,11 +138,21 @@ def visualize(lanes, connected_ports):
     
     fig, ax = plt.subplots(figsize=(20, 15), facecolor='#f0f0f0')
     
-    # Plot Lanes
-    lanes.plot(ax=ax, color='#1f77b4', linewidth=0.5, alpha=0.6, label='Shipping Lanes', zorder=1)
-    
-    # Plot Connected Ports
-    connected_ports.plot(ax=ax, color='#d62728', markersize=10, alpha=0.9, label='Connected Ports', zorder=2)
+    # Plot Lanes as a single LineCollection: one artist for all segments
+    # instead of per-geometry path creation inside GeoPandas' plot
+    lane_geoms = lanes.geometry.explode(ignore_index=True).values
+    coords, line_idx = shapely.get_coordinates(lane_geoms, return_index=True)
+    lane_segments = np.split(coords, np.flatnonzero(np.diff(line_idx)) + 1)
+    # rasterized: vector exports (PDF/SVG) collapse the lane layer into
+    # one bitmap instead of embedding every segment path; PNG is unaffected
+    ax.add_collection(LineCollection(lane_segments, colors='#1f77b4', linewidths=0.5,
+                                     alpha=0.6, label='Shipping Lanes', zorder=1,
+                                     rasterized=True))
+
+    # Plot Connected Ports in one scatter call over pre-extracted arrays
+    ax.scatter(connected_ports.geometry.x.to_numpy(), connected_ports.geometry.y.to_numpy(),
+               s=10, c='#d62728', alpha=0.9, label='Connected Ports', zorder=2)
+    ax.autoscale_view()
     
     plt.title(f"Global Maritime Network: Connected Ports ({DISTANCE_THRESHOLD_KM}km Threshold)", fontsize=16)
     plt.legend(loc='lower left')
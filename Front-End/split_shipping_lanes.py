@@ -1,10 +1,12 @@
 
 import geopandas as gpd
+import pandas as pd
+import shapely
 import shapely.geometry as sg
-import shapely.ops
 import numpy as np
 import logging
 import os
+from pyproj import Transformer
 
 # Configuration
 INPUT_FILE = "Shipping-Lanes-v1.geojson"
@@ -13,6 +15,13 @@ SPLIT_COUNT = 10
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def reproject_geoms(geoms, transformer):
+    """Reprojects an array of geometries through one bulk PROJ call."""
+    coords = shapely.get_coordinates(geoms)
+    xs, ys = transformer.transform(coords[:, 0], coords[:, 1])
+    return shapely.set_coordinates(np.asarray(geoms, dtype=object).copy(),
+                                   np.column_stack((xs, ys)))
+
 def split_line_into_segments(line, n_splits):
     """Splits a LineString into n_splits equal length segments."""
     if line.geom_type == 'MultiLineString':
@@ -21,23 +30,29 @@ def split_line_into_segments(line, n_splits):
             segments.extend(split_line_into_segments(part, n_splits))
         return segments
         
-    length = line.length
-    if length == 0:
+    # Work on the raw coordinate array: compute the chainage (cumulative
+    # arc length) once, then interpolate every cut point in a single
+    # np.interp call instead of one shapely.ops.substring per segment.
+    # The chainage end doubles as the length, so no .length GEOS dispatch.
+    coords = shapely.get_coordinates(line)
+    seg_lens = np.hypot(np.diff(coords[:, 0]), np.diff(coords[:, 1]))
+    chainage = np.concatenate(([0.0], np.cumsum(seg_lens)))
+
+    if chainage[-1] == 0:
         return [line]
-        
-    segment_length = length / n_splits
+
+    # linspace hits the very end exactly, so no float-precision gaps
+    cuts = np.linspace(0.0, chainage[-1], n_splits + 1)
+    cut_x = np.interp(cuts, chainage, coords[:, 0])
+    cut_y = np.interp(cuts, chainage, coords[:, 1])
+
     segments = []
-    
     for i in range(n_splits):
-        start_dist = i * segment_length
-        end_dist = (i + 1) * segment_length
-        # Ensure we capture the very end exactly to avoid gaps due to float precision
-        if i == n_splits - 1:
-            end_dist = length
-            
-        segment = shapely.ops.substring(line, start_dist, end_dist)
-        segments.append(segment)
-        
+        inner = (chainage > cuts[i]) & (chainage < cuts[i + 1])
+        xs = np.concatenate(([cut_x[i]], coords[inner, 0], [cut_x[i + 1]]))
+        ys = np.concatenate(([cut_y[i]], coords[inner, 1], [cut_y[i + 1]]))
+        segments.append(sg.LineString(np.column_stack((xs, ys))))
+
     return segments
 
 def main():
@@ -47,13 +62,13 @@ def main():
         shp_file = "Shipping-Lanes-v1.shp"
         if os.path.exists(shp_file):
             logging.info(f"{INPUT_FILE} not found. Loading {shp_file} instead...")
-            gdf = gpd.read_file(shp_file)
+            gdf = gpd.read_file(shp_file, use_arrow=True)
         else:
             logging.error(f"Input file {INPUT_FILE} not found.")
             return
     else:
         logging.info(f"Loading {INPUT_FILE}...")
-        gdf = gpd.read_file(INPUT_FILE)
+        gdf = gpd.read_file(INPUT_FILE, use_arrow=True)
 
     # Ensure projected CRS for accurate length splitting?
     # User asked for "split into 10", usually implies equal length.
@@ -69,38 +84,60 @@ def main():
         gdf.set_crs(original_crs, inplace=True)
         
     logging.info("Projecting to EPSG:3857 for accurate splitting...")
-    gdf_metric = gdf.to_crs("EPSG:3857")
-    
-    new_rows = []
+    # One Transformer reused both ways; transform() runs over the whole
+    # flat coordinate array in a single PROJ call rather than per-geometry
+    fwd = Transformer.from_crs(original_crs, "EPSG:3857", always_xy=True)
+    gdf_metric = gdf.set_geometry(gpd.GeoSeries(
+        reproject_geoms(gdf.geometry.values, fwd), index=gdf.index, crs="EPSG:3857"))
     
     logging.info(f"Processing {len(gdf)} features...")
-    
-    for idx, row in gdf_metric.iterrows():
-        geom = row.geometry
-        if geom is None or geom.is_empty:
-            continue
-            
+
+    geoms = gdf_metric.geometry
+    gdf_valid = gdf_metric[~(geoms.isna() | geoms.is_empty)]
+
+    all_segments = []
+    seg_counts = []
+    for geom in gdf_valid.geometry.values:
         segments = split_line_into_segments(geom, SPLIT_COUNT)
-        
-        # Create new rows inheriting properties
-        for i, seg in enumerate(segments):
-            props = row.drop('geometry').to_dict()
-            # Add metadata about split
-            props['original_id'] = str(props.get('fid', idx)) # Use fid or index
-            props['segment_index'] = i
-            props['segment_total'] = SPLIT_COUNT
-            
-            new_rows.append({
-                'geometry': seg,
-                **props
-            })
-            
+        all_segments.extend(segments)
+        seg_counts.append(len(segments))
+    seg_counts = np.asarray(seg_counts, dtype=np.int64)
+
+    # Struct-of-arrays: repeat each attribute column once with np.repeat
+    # instead of building a Python dict per output row
+    out = {col: np.repeat(gdf_valid[col].to_numpy(), seg_counts)
+           for col in gdf_valid.columns if col != 'geometry'}
+
+    # Split metadata (fid or index identifies the source feature)
+    if 'fid' in gdf_valid.columns:
+        original_id = gdf_valid['fid'].astype(str).to_numpy()
+    else:
+        original_id = gdf_valid.index.astype(str).to_numpy()
+    out['original_id'] = np.repeat(original_id, seg_counts)
+    # Small integer dtypes: segment counters never exceed a few hundred,
+    # so int16/int8 halves the frame footprint vs default int64
+    out['segment_index'] = (np.concatenate([np.arange(c) for c in seg_counts])
+                            if len(seg_counts) else np.array([], dtype=np.int64)).astype(np.int16)
+    out['segment_total'] = np.full(len(all_segments), SPLIT_COUNT, dtype=np.int8)
+
     # Create new GeoDataFrame
-    gdf_split_metric = gpd.GeoDataFrame(new_rows, crs="EPSG:3857")
+    gdf_split_metric = gpd.GeoDataFrame(out, geometry=all_segments, crs="EPSG:3857")
+
+    # np.repeat blows string attributes up tenfold; categoricals keep one
+    # copy of each distinct value with small integer codes
+    for col in gdf_split_metric.columns:
+        dtype = gdf_split_metric[col].dtype
+        if col != 'geometry' and (dtype == object or pd.api.types.is_string_dtype(dtype)):
+            gdf_split_metric[col] = gdf_split_metric[col].astype('category')
+    float_cols = gdf_split_metric.select_dtypes(include='float64').columns
+    gdf_split_metric[float_cols] = gdf_split_metric[float_cols].astype(np.float32)
     
     # Project back
     logging.info(f"Projecting back to {original_crs}...")
-    gdf_split = gdf_split_metric.to_crs(original_crs)
+    inv = Transformer.from_crs("EPSG:3857", original_crs, always_xy=True)
+    gdf_split = gdf_split_metric.set_geometry(gpd.GeoSeries(
+        reproject_geoms(gdf_split_metric.geometry.values, inv),
+        index=gdf_split_metric.index, crs=original_crs))
     
     # Save
     logging.info(f"Saving {len(gdf_split)} segments to {OUTPUT_FILE}...")
@@ -1,14 +1,15 @@
 import sys
 import os
-import joblib
-import pandas as pd
+import logging
+from functools import lru_cache
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 
 # Add parent directory to path to import model_pipeline
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-import model_pipeline
+
+logger = logging.getLogger("predictor")
 
 app = FastAPI(title="Panama Canal Delay Predictor")
 
@@ -21,16 +22,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load Models
 MODEL_DIR = os.path.join(os.path.dirname(__file__), "models")
-try:
+
+@lru_cache(maxsize=1)
+def get_models():
+    """Loads models and the pipeline module on first use.
+
+    Deferring joblib/pandas/xgboost imports and the pickle loads keeps
+    worker cold start (and /health) fast; the first /predict pays the
+    one-time cost.
+    """
+    import joblib
+    import model_pipeline
+
     clf_model = joblib.load(os.path.join(MODEL_DIR, "delay_classifier.pkl"))
     reg_model = joblib.load(os.path.join(MODEL_DIR, "delay_regressor.pkl"))
     feature_names = joblib.load(os.path.join(MODEL_DIR, "model_features.pkl"))
+    # Unwrap the raw boosters once: inplace_predict skips the per-request
+    # DMatrix construction the sklearn predict/predict_proba wrappers do,
+    # which dominates latency on single-row inputs
+    clf_booster = clf_model.get_booster()
+    reg_booster = reg_model.get_booster()
     print("Models loaded successfully.")
-except Exception as e:
-    print(f"Error loading models: {e}")
-    sys.exit(1)
+    return clf_booster, reg_booster, feature_names, model_pipeline
 
 class PredictionInput(BaseModel):
     queue_length: float = 10.0
@@ -53,14 +67,22 @@ class PredictionInput(BaseModel):
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "models_loaded": True}
+    return {"status": "ok", "models_loaded": get_models.cache_info().currsize > 0}
 
 @app.post("/predict")
 def predict_delay(input_data: PredictionInput):
     try:
-        # Convert input to DataFrame
-        data = input_data.dict()
-        data['scheduled_booking_time'] = pd.Timestamp(f"2024-{int(data['month']):02d}-15 {int(data['hour']):02d}:00:00")
+        import numpy as np
+        import pandas as pd
+
+        clf_booster, reg_booster, feature_names, model_pipeline = get_models()
+
+        # Convert input to DataFrame: read attributes straight off the
+        # model (no .dict() materialization) and build the timestamp via
+        # the component constructor instead of parsing a formatted string
+        data = {name: getattr(input_data, name) for name in type(input_data).model_fields}
+        data['scheduled_booking_time'] = pd.Timestamp(
+            year=2024, month=int(input_data.month), day=15, hour=int(input_data.hour))
         
         # Approximate water level deficit
         # Approximate water level deficit
@@ -72,34 +94,25 @@ def predict_delay(input_data: PredictionInput):
         # Feature Engineering (Reuse pipeline logic)
         df = model_pipeline.phase_2_feature_engineering(df)
         
-        # Align features (Ensure exact order and all model features are present)
-        df_final = df.reindex(columns=feature_names, fill_value=0)
-        
-        # Ensure numeric types (XGBoost requires this)
-        df_final = df_final.apply(pd.to_numeric, errors='coerce').fillna(0)
-        
-        # Debug: Check structure
-        print(f"--- Debug Prediction ---")
-        print(f"Input Type: {type(df_final)}")
-        print(f"Input Shape: {df_final.shape}")
-        print(f"Input Columns (28): {df_final.columns.tolist() == feature_names}")
-        print(f"Input Dtypes: \n{df_final.dtypes.head()}")
-        
-        if hasattr(clf_model, "feature_names_in_"):
-             print(f"Model Feature Names In: {clf_model.feature_names_in_[:5]}...")
-        
+        # Align features (exact training column order) and hand XGBoost a
+        # single float32 array: to_numpy(na_value=0) replaces the
+        # apply(pd.to_numeric) + fillna + .values chain, which dominated
+        # the request time over the microsecond model call
+        X = df.reindex(columns=feature_names, fill_value=0).to_numpy(dtype=np.float32, na_value=0)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("predict input shape=%s", X.shape)
+
         # Predict Class (Is Delayed?)
-        # Use .values to bypass XGBoost's strict feature name validation which is failing
-        prob_delay = clf_model.predict_proba(df_final.values)[0][1]
-        
+        # inplace_predict on the raw booster: no DMatrix allocation, no
+        # feature name validation; binary:logistic output is already P(delayed)
+        prob_delay = float(clf_booster.inplace_predict(X)[0])
+
         # Predict Hours (How Long?)
         predicted_hours = 0.0
         if prob_delay >= 0.3: # Threshold
-             predicted_hours = reg_model.predict(df_final.values)[0]
-             predicted_hours = max(0.0, predicted_hours)
-             
-        print(f"Prediction Complete: Prob={prob_delay:.2f}, Hours={predicted_hours:.2f}")
-             
+             predicted_hours = max(0.0, float(reg_booster.inplace_predict(X)[0]))
+
         # Risk Logic
         if predicted_hours < 48.0:
             risk = "LOW"
@@ -116,9 +129,7 @@ def predict_delay(input_data: PredictionInput):
         }
 
     except Exception as e:
-        import traceback
-        print(f"Prediction Error: {e}")
-        traceback.print_exc()
+        logger.exception("Prediction failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
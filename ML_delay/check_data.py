@@ -1,7 +1,14 @@
 
 import pandas as pd
 
-df = pd.read_csv("panama_canal_transits_merged.csv")
+# Only these columns are referenced below; projecting them through the
+# pyarrow engine skips parsing the rest of the file
+USECOLS = ['delay_hours', 'is_delayed', 'rainfall_mm', 'queue_length', 'is_booked']
+
+try:
+    df = pd.read_csv("panama_canal_transits_merged.csv", usecols=USECOLS, engine="pyarrow")
+except ImportError:
+    df = pd.read_csv("panama_canal_transits_merged.csv", usecols=USECOLS)
 
 print("--- Data Stats ---")
 print(df['delay_hours'].describe())
@@ -37,12 +44,18 @@ bins = [
     (140, 300, "Queue > 140 (Extreme)")
 ]
 
-for low, high, label in bins:
-    subset = df[(df['queue_length'] >= low) & (df['queue_length'] <= high) & (df['is_booked'] == 0)]
-    if len(subset) > 0:
+# Single pass: cut queue_length into the (closed) bins once and aggregate
+# all stats in one groupby instead of re-filtering the frame per bin
+nonbooked = df[df['is_booked'] == 0]
+intervals = pd.IntervalIndex.from_tuples([(low, high) for low, high, _ in bins], closed='both')
+binned = pd.cut(nonbooked['queue_length'], intervals)
+stats = nonbooked.groupby(binned, observed=False)['delay_hours'].agg(['count', 'mean', 'min', 'max'])
+
+for (_, _, label), (_, row) in zip(bins, stats.iterrows()):
+    if row['count'] > 0:
         print(f"\n{label}:")
-        print(f"  Count: {len(subset)}")
-        print(f"  Avg Delay: {subset['delay_hours'].mean():.2f} hrs")
-        print(f"  Min/Max: {subset['delay_hours'].min():.1f} - {subset['delay_hours'].max():.1f}")
+        print(f"  Count: {int(row['count'])}")
+        print(f"  Avg Delay: {row['mean']:.2f} hrs")
+        print(f"  Min/Max: {row['min']:.1f} - {row['max']:.1f}")
     else:
         print(f"\n{label}: No records found.")
@@ -1,7 +1,5 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
 
 # --- Configuration ---
@@ -18,7 +16,9 @@ def phase_1_data_validation(df):
     # Reconstruct scheduled_booking_time if missing
     if 'scheduled_booking_time' not in df.columns:
         print("Reconstructing 'scheduled_booking_time' from 'scheduled_date' and 'scheduled_hour'...")
-        df['scheduled_booking_time'] = pd.to_datetime(df['scheduled_date']) + pd.to_timedelta(df['scheduled_hour'], unit='h')
+        # Explicit format skips per-chunk format inference during the parse
+        df['scheduled_booking_time'] = pd.to_datetime(df['scheduled_date'], format='%Y-%m-%d') \
+            + pd.to_timedelta(df['scheduled_hour'], unit='h')
     else:
         df['scheduled_booking_time'] = pd.to_datetime(df['scheduled_booking_time'])
 
@@ -30,9 +30,10 @@ def phase_1_data_validation(df):
         # In a real pipeline we might raise an error, but here we proceed with warning
     
     # 3. Correlations
-    # Select numeric columns only
-    numeric_df = df.select_dtypes(include=[np.number])
-    correlations = numeric_df.corr()['is_delayed'].sort_values(ascending=False)
+    # Select numeric columns only; corrwith against the target is one
+    # O(N*F) pass instead of the full FxF .corr() matrix, in float32
+    numeric_df = df.select_dtypes(include=[np.number]).astype(np.float32, copy=False)
+    correlations = numeric_df.corrwith(numeric_df['is_delayed']).sort_values(ascending=False)
     print("\nTop 10 Feature Correlations with Target:")
     print(correlations.head(11).drop('is_delayed')) # Top 10 excluding self
     
@@ -41,39 +42,44 @@ def phase_1_data_validation(df):
 def phase_2_feature_engineering(df):
     print("\n--- Phase 2: Feature Engineering ---")
     
-    # 1. Temporal
-    df['month'] = df['scheduled_booking_time'].dt.month
-    df['day_of_week'] = df['scheduled_booking_time'].dt.dayofweek
-    df['hour'] = df['scheduled_booking_time'].dt.hour
-    df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)
-    # Quarter
-    df['quarter'] = df['scheduled_booking_time'].dt.quarter
-    # Season (approximate for Panama)
-    df['is_dry_season'] = df['month'].isin([1, 2, 3, 4]).astype(int)
+    # Compute the pieces once as locals, then land every derived column in
+    # a single assign (one block consolidation instead of ~15), with int8
+    # flags rather than default int64
+    dt = df['scheduled_booking_time'].dt
+    month = dt.month
+    day_of_week = dt.dayofweek
 
-    # 2. Risk Flags
-    # Congestion
-    # Assuming 'daily_transit_count' is the proxy for congestion provided in dataset
-    df['is_high_congestion'] = (df['daily_transit_count'] > 40).astype(int)
-    # booking_density: count / 36 (approx capacity)
-    df['booking_density'] = df['daily_transit_count'] / 36.0
-    
-    # Water
-    df['is_low_water'] = (df['gatun_lake_level_m'] < 25.0).astype(int)
-    df['is_critical_water'] = (df['gatun_lake_level_m'] < 24.5).astype(int)
-    
-    # Vessel
+    # Risk Flags
+    # 'daily_transit_count' is the proxy for congestion provided in dataset
+    is_high_congestion = (df['daily_transit_count'] > 40).astype(np.int8)
+    is_low_water = (df['gatun_lake_level_m'] < 25.0).astype(np.int8)
+    is_critical_water = (df['gatun_lake_level_m'] < 24.5).astype(np.int8)
     # vessel_size_risk: Neopanamax are higher risk
-    df['vessel_size_risk'] = (df['vessel_size_category'] == 'Neopanamax').astype(int)
-    # is_oversized (example logic: high beam or length)
-    df['is_oversized'] = ((df['vessel_beam_m'] > 45) | (df['vessel_length_m'] > 350)).astype(int)
-    # draft_risk: > 14m is risky (approx 46ft)
-    df['draft_risk'] = (df['vessel_draft_m'] > 14.0).astype(int)
-    
-    # 3. Interactions
-    df['low_water_x_high_congestion'] = df['is_low_water'] * df['is_high_congestion']
-    df['drought_x_large_vessel'] = df['is_critical_water'] * df['vessel_size_risk']
-    # Removed water_level_deficit interaction per user request
+    vessel_size_risk = df['vessel_size_category'].eq('Neopanamax').astype(np.int8)
+
+    df = df.assign(
+        # 1. Temporal (Season approximate for Panama)
+        month=month,
+        day_of_week=day_of_week,
+        hour=dt.hour,
+        is_weekend=(day_of_week >= 5).astype(np.int8),
+        quarter=dt.quarter,
+        is_dry_season=month.isin([1, 2, 3, 4]).astype(np.int8),
+        # 2. Risk Flags
+        is_high_congestion=is_high_congestion,
+        # booking_density: count / 36 (approx capacity)
+        booking_density=df['daily_transit_count'] / 36.0,
+        is_low_water=is_low_water,
+        is_critical_water=is_critical_water,
+        vessel_size_risk=vessel_size_risk,
+        # is_oversized (example logic: high beam or length)
+        is_oversized=((df['vessel_beam_m'] > 45) | (df['vessel_length_m'] > 350)).astype(np.int8),
+        # draft_risk: > 14m is risky (approx 46ft)
+        draft_risk=(df['vessel_draft_m'] > 14.0).astype(np.int8),
+        # 3. Interactions (water_level_deficit interaction removed per user request)
+        low_water_x_high_congestion=is_low_water * is_high_congestion,
+        drought_x_large_vessel=is_critical_water * vessel_size_risk,
+    )
     
     # 4. Encode Categoricals
     # No categorical encoding needed as we dropped non-essential text columns.
@@ -110,13 +116,19 @@ def phase_2_feature_engineering(df):
         print(df.isnull().sum()[df.isnull().sum() > 0])
         # Fill/Drop?
         df = df.fillna(0) # Simple fill for now
-        
+
+    # Quantize for hist training: continuous features to float32 and the
+    # remaining wide ints to int16 (largest is queue_length, max ~300) —
+    # histogram building is bandwidth-bound, so byte width matters
+    float_cols = df.select_dtypes('float64').columns
+    df[float_cols] = df[float_cols].astype(np.float32)
+    int_cols = df.select_dtypes('int64').columns
+    df[int_cols] = df[int_cols].astype(np.int16)
+
     return df
 
 
 # --- Phase 3: Train/Test Split ---
-from sklearn.model_selection import train_test_split
-
 def phase_3_split_data(df):
     print("\n--- Phase 3: Train/Test Split ---")
     
@@ -146,9 +158,9 @@ def phase_3_split_data(df):
     return X_train, X_test, y_class_train, y_class_test, y_reg_train, y_reg_test
 
 # --- Phase 4: Model Training ---
-import xgboost as xgb
-
 def phase_4_model_training(X_train, y_class_train, y_reg_train):
+    import xgboost as xgb
+
     print("\n--- Phase 4: Model Training (Dual Models) ---")
     
     # 1. Classifier (Is Delayed?)
@@ -159,7 +171,9 @@ def phase_4_model_training(X_train, y_class_train, y_reg_train):
         max_depth=4,
         learning_rate=0.1,
         random_state=42,
-        eval_metric='logloss'
+        eval_metric='logloss',
+        tree_method='hist', # Bin features once, grow trees via histogram subtraction
+        max_bin=256
     )
     clf_model.fit(X_train, y_class_train)
     
@@ -175,7 +189,9 @@ def phase_4_model_training(X_train, y_class_train, y_reg_train):
         n_estimators=100,
         max_depth=4,
         learning_rate=0.1,
-        random_state=42
+        random_state=42,
+        tree_method='hist',
+        max_bin=256
     )
     reg_model.fit(X_train_delayed, y_reg_train_delayed)
     
@@ -193,9 +209,14 @@ def phase_4_model_training(X_train, y_class_train, y_reg_train):
     return clf_model, reg_model
 
 # --- Phase 5: Evaluation ---
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score, confusion_matrix, mean_absolute_error, mean_squared_error
-
 def phase_5_evaluation(clf_model, reg_model, X_test, y_class_test, y_reg_test, feature_names):
+    # Deferred: matplotlib/seaborn add ~500ms and tens of MB at import,
+    # and callers that only want phase_2 (the API, the simulator) never
+    # pay for them
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score, mean_absolute_error, mean_squared_error
+
     print("\n--- Phase 5: Evaluation ---")
     
     # --- Classifier Evaluation ---
@@ -254,17 +275,23 @@ def predict_transit_delay(row_features, clf_model, reg_model):
         row_features = row_features.to_frame().T
     elif isinstance(row_features, dict):
         row_features = pd.DataFrame([row_features])
-        
-    # 1. Predict Probability
-    prob_delay = clf_model.predict_proba(row_features)[:, 1][0]
-    
+
+    # One contiguous float32 row fed straight to the boosters:
+    # inplace_predict skips the DMatrix build the sklearn wrappers pay
+    # per call, which dominates single-row inference. NaNs pass through
+    # as XGBoost missing values, same as the wrapper path.
+    X = np.ascontiguousarray(row_features.to_numpy(dtype=np.float32))
+
+    # 1. Predict Probability (binary:logistic output is already P(delayed))
+    prob_delay = float(clf_model.get_booster().inplace_predict(X)[0])
+
     # 2. Logic
     predicted_hours = 0.0
     risk_level = "LOW" # Default to LOW
-    
+
     # Predict hours if probability is above a threshold
     if prob_delay >= 0.30: # Use the classifier's prediction as a gate
-        predicted_hours = reg_model.predict(row_features)[0]
+        predicted_hours = float(reg_model.get_booster().inplace_predict(X)[0])
         # Clip negative predictions
         predicted_hours = max(0.0, predicted_hours)
     
@@ -282,44 +309,6 @@ def predict_transit_delay(row_features, clf_model, reg_model):
         
     return prob_delay, predicted_hours, risk_level
 
-def main():
-    # Load Data
-    try:
-        df = pd.read_csv(DATA_FILE)
-    except FileNotFoundError:
-        print(f"Error: {DATA_FILE} not found. Run generation script first.")
-        return
-
-    # Phase 1
-    df = phase_1_data_validation(df)
-    
-    # Phase 2
-    df = phase_2_feature_engineering(df)
-    
-    # Save intermediate for inspection
-    df.to_csv("panama_canal_features.csv", index=False)
-    print("\nPhase 2 Complete. Saved to 'panama_canal_features.csv'.")
-
-    # Phase 3
-    X_train, X_test, y_class_train, y_class_test, y_reg_train, y_reg_test = phase_3_split_data(df)
-    
-    # Phase 4
-    clf_model, reg_model = phase_4_model_training(X_train, y_class_train, y_reg_train)
-    
-    # Phase 5
-    phase_5_evaluation(clf_model, reg_model, X_test, y_class_test, y_reg_test, X_train.columns)
-    
-    # Phase 6: Demo Inference
-    print("\n--- Phase 6: Inference Demo ---")
-    sample_row = X_test.iloc[[0]]
-    prob, hours, risk = predict_transit_delay(sample_row, clf_model, reg_model)
-    
-    print(f"Sample Transit Inference:")
-    print(f"Delay Probability: {prob:.1%}")
-    print(f"Risk Level:        {risk}")
-    print(f"Est. Delay Hours:  {hours:.2f} hrs") 
-    print(f"Actual Delay:      {y_reg_test.iloc[0]:.2f} hrs (Delayed? {y_class_test.iloc[0]})")
-
 
 # --- Phase 7: Scenario Simulation ---
 def phase_7_simulation(clf_model, reg_model, feature_names):
@@ -410,28 +399,30 @@ def phase_7_simulation(clf_model, reg_model, feature_names):
     # Reorder and filter to match exact training features
     sim_df = sim_df[feature_names]
     
-    # Predict
+    # Predict: one batched call per model over the whole scenario frame,
+    # with the same probability gate and risk buckets as
+    # predict_transit_delay applied vectorized
     print("\n--- Simulation Results ---")
-    results = []
-    
-    for i, row in sim_df.iterrows():
-        name = scenarios[i]['name']
-        prob, hours, risk = predict_transit_delay(row, clf_model, reg_model)
-        
-        results.append({
-            'Scenario': name,
-            'Risk Level': risk,
-            'Delay Prob': f"{prob:.1%}",
-            'Est. Delay': f"{hours:.2f} hrs"
-        })
-        
-    results_df = pd.DataFrame(results)
+    probs = clf_model.predict_proba(sim_df)[:, 1]
+    hours = np.where(probs >= 0.30, np.clip(reg_model.predict(sim_df), 0.0, None), 0.0)
+    risks = np.select([hours < 48.0, hours < 168.0], ["LOW", "MEDIUM"], default="HIGH")
+
+    results_df = pd.DataFrame({
+        'Scenario': [s['name'] for s in scenarios],
+        'Risk Level': risks,
+        'Delay Prob': [f"{p:.1%}" for p in probs],
+        'Est. Delay': [f"{h:.2f} hrs" for h in hours]
+    })
     print(results_df.to_string(index=False))
 
 def main():
-    # Load Data
+    # Load Data (typed columnar read when the input is Parquet; CSV kept
+    # as the default since that is what the generator ships)
     try:
-        df = pd.read_csv(DATA_FILE)
+        if DATA_FILE.endswith('.parquet'):
+            df = pd.read_parquet(DATA_FILE, engine='pyarrow')
+        else:
+            df = pd.read_csv(DATA_FILE)
     except FileNotFoundError:
         print(f"Error: {DATA_FILE} not found. Run generation script first.")
         return
@@ -442,9 +433,14 @@ def main():
     # Phase 2
     df = phase_2_feature_engineering(df)
     
-    # Save intermediate for inspection
-    df.to_csv("panama_canal_features.csv", index=False)
-    print("\nPhase 2 Complete. Saved to 'panama_canal_features.csv'.")
+    # Save intermediate for inspection (Parquet keeps dtypes and skips the
+    # text round trip; CSV fallback when pyarrow is unavailable)
+    try:
+        df.to_parquet("panama_canal_features.parquet", engine='pyarrow', compression='zstd')
+        print("\nPhase 2 Complete. Saved to 'panama_canal_features.parquet'.")
+    except ImportError:
+        df.to_csv("panama_canal_features.csv", index=False)
+        print("\nPhase 2 Complete. Saved to 'panama_canal_features.csv'.")
 
     # Phase 3
     X_train, X_test, y_class_train, y_class_test, y_reg_train, y_reg_test = phase_3_split_data(df)